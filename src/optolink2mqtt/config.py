@@ -24,6 +24,7 @@ import yamale
 from yamale import YamaleError
 from platformdirs import PlatformDirs
 import socket
+from types import MappingProxyType
 
 from .ha_units import HA_MEASUREMENT_UNITS
 from .ha_support import (
@@ -145,10 +146,14 @@ class Config:
         self._fill_defaults_mqtt()
         self._fill_defaults_optolink()
 
-        # add default values for optional configuration parameters in registers_poll_list
+        # add default values for optional configuration parameters in registers_poll_list;
+        # register definitions are then frozen: OptolinkVS2Register instances reference them
+        # without making any copy
         validated_registers = []
         for reg in self.config["registers_poll_list"]:
-            validated_registers.append(self._fill_defaults_register(reg))
+            validated_registers.append(
+                MappingProxyType(self._fill_defaults_register(reg))
+            )
         self.config["registers_poll_list"] = validated_registers
 
         # additional coherency check:
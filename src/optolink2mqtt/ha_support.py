@@ -18,6 +18,10 @@ limitations under the License.
 """
 
 HA_SUPPORTED_PLATFORMS = ["sensor", "binary_sensor", "select", "switch", "number"]
+
+# platforms allowing HomeAssistant to send commands / write values
+HA_WRITABLE_PLATFORMS = frozenset(["switch", "select", "number"])
+
 HA_SUPPORTED_DEVICE_CLASSES = {
     # see https://www.home-assistant.io/integrations/binary_sensor/#device-class
     "binary_sensor": [
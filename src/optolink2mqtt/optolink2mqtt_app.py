@@ -33,7 +33,7 @@ import paho.mqtt.client as paho  # pip install paho-mqtt
 from .config import Config
 from .mqtt_client import MqttClient
 from .optolinkvs2_register import OptolinkVS2Register
-from .optolinkvs2_protocol import OptolinkVS2Protocol
+from .optolinkvs2_protocol import OptolinkVS2Protocol, OptolinkVS2RxData
 
 
 class Optolink2MqttApp:
@@ -67,19 +67,31 @@ class Optolink2MqttApp:
             f"{self.optolink_interface.get_human_friendly_stats()}"
         )
 
-    def _sample_register(self, reg: OptolinkVS2Register) -> bool:
+    def _check_register_read(
+        self, reg: OptolinkVS2Register, rx_data: OptolinkVS2RxData
+    ) -> bool:
         """
-        Samples a single register and publishes its value on MQTT.
+        Returns True if the register was read successfully over Optolink; logs an error otherwise.
         """
 
-        rx_data = self.optolink_interface.read_datapoint_ext(reg.address, reg.length)
         if not rx_data.is_successful():
             # NOTE that the error is already logged inside OptolinkVS2Protocol
             #      which also maintains error counters
             logging.error(
-                f"Failed to read register '{reg.name}' (addr=0x{reg.address:04x}): error code 0x{rx_data.return_code:02x}"
+                f"Failed to read register '{reg.name}' (addr=0x{reg.address:04x}): error code 0x{rx_data.receive_code:02x}"
             )
             return False
+        return True
+
+    def _publish_register(
+        self, reg: OptolinkVS2Register, rx_data: OptolinkVS2RxData
+    ) -> bool:
+        """
+        Publishes on MQTT the value of a register, obtained from the data read over Optolink.
+        """
+
+        if not self._check_register_read(reg, rx_data):
+            return False
 
         # publish on MQTT the "value" obtained from the raw data
         self.mqtt_client.publish(
@@ -87,16 +99,38 @@ class Optolink2MqttApp:
         )
         return True
 
+    def _sample_register(self, reg: OptolinkVS2Register) -> bool:
+        """
+        Samples a single register and publishes its value on MQTT.
+        """
+
+        rx_data = self.optolink_interface.read_datapoint_ext(reg.address, reg.length)
+        return self._publish_register(reg, rx_data)
+
     def _sample_all_registers(self) -> None:
         """
         Samples all registers and publishes their values on MQTT.
         """
 
-        nregs = 0
-        for reg in self.register_list_by_cmd_topic.values():
-            if self._sample_register(reg):
-                nregs += 1
-        logging.info(f"Sampled {nregs} registers successfully and published on MQTT")
+        regs = list(self.register_list_by_cmd_topic.values())
+        rx_data_list = self.optolink_interface.read_datapoints_batch(
+            [(reg.address, reg.length) for reg in regs]
+        )
+
+        read_regs = []
+        rawdatas = []
+        for reg, rx_data in zip(regs, rx_data_list):
+            if self._check_register_read(reg, rx_data):
+                read_regs.append(reg)
+                rawdatas.append(rx_data.data)
+
+        # decode all the values at once, then publish them on MQTT
+        values = OptolinkVS2Register.decode_batch(read_regs, rawdatas)
+        for reg, value in zip(read_regs, values):
+            self.mqtt_client.publish(reg.get_mqtt_state_topic(), value)
+        logging.info(
+            f"Sampled {len(read_regs)} registers successfully and published on MQTT"
+        )
 
     @staticmethod
     def on_schedule_timer(app: "Optolink2MqttApp", reg: OptolinkVS2Register) -> None:
@@ -106,9 +140,10 @@ class Optolink2MqttApp:
         through the 'app' parameter.
         """
 
-        logging.debug(
-            f"Optolink2MqttApp.on_schedule_timer(name={reg.name}, addr=0x{reg.address:02x})",
-        )
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug(
+                f"Optolink2MqttApp.on_schedule_timer(name={reg.name}, addr=0x{reg.address:02x})",
+            )
 
         app._sample_register(reg)
 
@@ -419,7 +454,7 @@ class Optolink2MqttApp:
                 )
             else:
                 logging.error(
-                    f"Failed to write register '{reg.name}' (addr=0x{reg.address:04x}): error code 0x{rx_data.return_code:02x}"
+                    f"Failed to write register '{reg.name}' (addr=0x{reg.address:04x}): error code 0x{rx_data.receive_code:02x}"
                 )
                 # keep going -- need to schedule a read later anyway
 
@@ -438,7 +473,8 @@ class Optolink2MqttApp:
     def _core_loop(self) -> None:
         """
         Runs the logic of optolink2mqtt application.
-        Every "sleep quantum" the app wakes up and checks whether
+        The app blocks on the queue of received MQTT messages till it's time to read
+        the next register, waking up every "sleep quantum" at most, and checks whether
         * it's time to read a register
         * some write request has been received over MQTT
         * MQTT discovery messages were requested
@@ -453,23 +489,24 @@ class Optolink2MqttApp:
             delay_for_next_register_sec = self.scheduler.run(blocking=False)
 
             # execute a sliced wait, so we reuse this thread to check for other occurrences
-            # (instead of resorting to a multithread Python app)
-            time_waited_sec = 0
-            while (
-                delay_for_next_register_sec > 0
-                and time_waited_sec < delay_for_next_register_sec
-            ):
-                time.sleep(sleep_quantum_sec)
-                time_waited_sec += sleep_quantum_sec
+            # (instead of resorting to a multithread Python app); MQTT messages wake us up
+            # as soon as they are received instead of at the end of the current quantum
+            deadline = time.monotonic() + delay_for_next_register_sec
+            while (remaining_sec := deadline - time.monotonic()) > 0:
+                try:
+                    msg = self.message_queue.get(
+                        timeout=min(remaining_sec, sleep_quantum_sec)
+                    )
+                except queue.Empty:
+                    msg = None  # no message to process
 
                 if self.config.config["mqtt"]["ha_discovery"]["enabled"]:
                     self._check_if_time_to_send_ha_discovery_messages()
 
-                try:
-                    msg = self.message_queue.get_nowait()
+                if msg is not None:
                     self._process_received_mqtt_message(msg)
-                except queue.Empty:
-                    continue  # no message to process
+                    # a write schedules an immediate read-back of the register
+                    break
 
     def run(self) -> int:
         """
@@ -24,6 +24,7 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import functools
 import time
 import serial
 import logging
@@ -143,6 +144,9 @@ class OptolinkVS2RxData:
         Payload data of the received telegram.
     """
 
+    # one instance is created for every telegram exchanged: avoid a __dict__ for each
+    __slots__ = ("receive_code", "address", "data")
+
     def __init__(self, receive_code: ErrorCode, address: int, data: bytearray):
         self.receive_code = receive_code
         self.address = address
@@ -160,6 +164,19 @@ class OptolinkVS2Protocol:
         https://github.com/openv/openv/wiki/Protokoll-300
     """
 
+    # max time allowed for each step of the VS2 initialization handshake
+    INIT_TIMEOUT_SEC = 3.0
+
+    # max time allowed for receiving a full telegram
+    RX_TIMEOUT_SEC = 3.0
+
+    # longest possible response: ACK + STX + Len + 255 bytes of payload + CRC
+    RX_BUFFER_LEN = 259
+
+    # bytes forwarded to ser2 are coalesced and written at the end of each receive;
+    # long raw receives are flushed every time this many bytes have been queued
+    SER2_FLUSH_THRESHOLD = 4096
+
     def __init__(
         self,
         ser: serial.Serial,
@@ -182,9 +199,33 @@ class OptolinkVS2Protocol:
         self.ser2 = ser2
         self.show_opto_rx = show_opto_rx
 
+        # preallocated buffer for received telegrams, reused across receive_telegram() calls
+        self._rx_buffer = bytearray(OptolinkVS2Protocol.RX_BUFFER_LEN)
+        self._rx_view = memoryview(self._rx_buffer)
+
+        # bytes received and not yet forwarded to ser2
+        self._ser2_buffer = bytearray()
+
         # local stats array/list
         self.stats_by_receive_code = [0] * ErrorCode.LastValue
 
+        self._tune_serial_port()
+
+    def _tune_serial_port(self) -> None:
+        """
+        Enables the low-latency mode of the serial port, if supported by the driver.
+        USB-serial adapters (like the FTDI chips used in most Optolink cables) by default
+        hold received bytes for up to 16ms before passing them to the kernel; since every
+        VS2 telegram is a request/response exchange, this delay is paid on every datapoint.
+
+        NOTE: the termios VMIN/VTIME settings are not touched here: pyserial implements
+        read timeouts via select() and resets VMIN/VTIME every time the port is reconfigured.
+        """
+        try:
+            self.ser.set_low_latency_mode(True)
+        except (AttributeError, NotImplementedError, ValueError) as e:
+            logging.info(f"Serial port low-latency mode not available: {e}")
+
     # ------------------------------------------------------------------
     # Initialization
     # ------------------------------------------------------------------
@@ -195,15 +236,8 @@ class OptolinkVS2Protocol:
         # then an EOT (0x04) is send
         self.ser.write(bytes([0x04]))  # EOT
 
-        # and for 30x100ms waited for an ENQ (0x05)
-        for _ in range(30):
-            time.sleep(0.1)
-            buff = self.ser.read(1)
-            if self.show_opto_rx:
-                logging.debug(f"VS2 received during INIT: {buff}")
-            if buff and buff[0] == 0x05:  # ENQ
-                break
-        else:
+        # and for up to 3sec waited for an ENQ (0x05)
+        if not self._wait_for_byte(0x05):  # ENQ
             logging.error("VS2: Timeout waiting for ENQ 0x05")
             return False
 
@@ -212,17 +246,27 @@ class OptolinkVS2Protocol:
         # after which a VS2_START_VS2, 0, 0 (0x16,0x00,0x00) is send
         self.ser.write(bytes([0x16, 0x00, 0x00]))  # START_VS2
 
-        # and within 30x100ms an VS2_ACK (0x06) is expected.
-        for _ in range(30):
-            time.sleep(0.1)
-            buff = self.ser.read(1)
+        # and within 3sec an VS2_ACK (0x06) is expected.
+        if not self._wait_for_byte(0x06):  # ACK
+            logging.error("VS2: Timeout waiting for 0x06")
+            return False
+
+        logging.info("VS2 Protocol initialized successfully")
+        return True
+
+    def _wait_for_byte(self, expected: int) -> bool:
+        """
+        Blocks till the 'expected' byte is received, discarding any other byte,
+        or till INIT_TIMEOUT_SEC have elapsed. Returns True if the byte was received.
+        """
+        deadline = time.monotonic() + OptolinkVS2Protocol.INIT_TIMEOUT_SEC
+        while time.monotonic() < deadline:
+            if not self._readinto_until_deadline(self._rx_view[:1], deadline):
+                break
             if self.show_opto_rx:
-                logging.debug(f"VS2 received during INIT: {buff}")
-            if buff and buff[0] == 0x06:  # ACK
-                logging.info("VS2 Protocol initialized successfully")
+                logging.debug(f"VS2 received during INIT: {self._rx_buffer[:1]}")
+            if self._rx_buffer[0] == expected:
                 return True
-
-        logging.error("VS2: Timeout waiting for 0x06")
         return False
 
     # ------------------------------------------------------------------
@@ -238,7 +282,14 @@ class OptolinkVS2Protocol:
     #     retcode, _, _ = self.write_datapoint_ext(addr, data)
     #     return retcode == 0x01
 
-    def read_datapoint_ext(self, addr: int, rdlen: int) -> OptolinkVS2RxData:
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _build_read_frame(addr: int, rdlen: int) -> bytes:
+        """
+        Returns the Virtual_READ request telegram for the given datapoint.
+        Registers are polled over and over with the same (addr, rdlen), so
+        the telegram is built only once and then cached.
+        """
         outbuff = bytearray(8)
         outbuff[0] = 0x41  # 0x41 frame start
         outbuff[1] = 0x05  # Len Payload
@@ -247,7 +298,11 @@ class OptolinkVS2Protocol:
         outbuff[4] = (addr >> 8) & 0xFF  # hi byte
         outbuff[5] = addr & 0xFF  # lo byte
         outbuff[6] = rdlen  # how many bytes to read
-        outbuff[7] = self.calc_crc(outbuff)
+        outbuff[7] = OptolinkVS2Protocol.calc_crc(outbuff)
+        return bytes(outbuff)
+
+    def read_datapoint_ext(self, addr: int, rdlen: int) -> OptolinkVS2RxData:
+        outbuff = self._build_read_frame(addr, rdlen)
 
         self.ser.reset_input_buffer()
         if self.ser.write(outbuff) != len(outbuff):
@@ -256,52 +311,63 @@ class OptolinkVS2Protocol:
 
         return self.receive_telegram(resptelegr=True, raw=False)
 
-    def write_datapoint_ext(self, addr: int, data: bytes) -> OptolinkVS2RxData:
-        wrlen = len(data)
-        outbuff = bytearray(wrlen + 8)
-        outbuff[0] = 0x41
-        outbuff[1] = 5 + wrlen
-        outbuff[2] = MessageIdentifier.RequestMessage
-        outbuff[3] = FunctionCodes.Virtual_WRITE  # Virtual_WRITE
-        outbuff[4] = (addr >> 8) & 0xFF
-        outbuff[5] = addr & 0xFF
-        outbuff[6] = wrlen
-
-        outbuff[7 : 7 + wrlen] = data
-        outbuff[7 + wrlen] = self.calc_crc(outbuff)
+    def read_datapoints_batch(
+        self, requests: list[tuple[int, int]]
+    ) -> list[OptolinkVS2RxData]:
+        """
+        Reads all the datapoints given as (addr, rdlen) tuples and returns
+        the received data, in the same order of the requests.
 
-        self.ser.reset_input_buffer()
-        if self.ser.write(outbuff) != len(outbuff):
-            self.stats_by_receive_code[ErrorCode.WriteFailure] += 1
-            return OptolinkVS2RxData(ErrorCode.WriteFailure, addr, bytearray())
+        NOTE: the VS2 protocol is strictly request/response: the Vitotronic handles
+        a single request at a time, so the request telegrams cannot be coalesced
+        in a single serial write. They are exchanged back-to-back instead.
+        """
+        return [self.read_datapoint_ext(addr, rdlen) for addr, rdlen in requests]
 
-        return self.receive_telegram(resptelegr=True, raw=False)
+    def write_datapoint_ext(self, addr: int, data: bytes) -> OptolinkVS2RxData:
+        return self.do_request(FunctionCodes.Virtual_WRITE, addr, len(data), data)
 
     # ------------------------------------------------------------------
     # Generic request
     # ------------------------------------------------------------------
 
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _build_request_header(
+        fctcode: int, addr: int, rlen: int, datalen: int, protid: int
+    ) -> tuple[bytes, int]:
+        """
+        Returns the first 7 bytes (STX up to the data length) of a request telegram,
+        together with their contribution to the telegram CRC.
+        The header only depends on the datapoint being accessed, so it's cached.
+        """
+        header = bytearray(7)
+        header[0] = 0x41  # 0x41 frame start
+        header[1] = 5 + datalen  # Len Payload
+        header[2] = protid  # Protocol|MsgIdentifier
+        # function code (sequence num is suppressed/ignored/overwritten here)
+        header[3] = fctcode & 0xFF
+        header[4] = (addr >> 8) & 0xFF  # hi byte
+        header[5] = addr & 0xFF  # lo byte
+        header[6] = rlen
+        return bytes(header), sum(header[1:])
+
     def do_request(
         self, fctcode: int, addr: int, rlen: int, data: bytes = b"", protid: int = 0x00
     ) -> OptolinkVS2RxData:
-        pldlen = 5 + len(data)
-        outbuff = bytearray(pldlen + 3)  # + STX, LEN, CRC
+        header, header_sum = self._build_request_header(
+            fctcode, addr, rlen, len(data), protid
+        )
 
-        outbuff[0] = 0x41  # 0x41 frame start
-        outbuff[1] = pldlen  # Len Payload
-        outbuff[2] = protid  # Protocol|MsgIdentifier
-        # function code (sequence num is suppressed/ignored/overwritten here)
-        outbuff[3] = fctcode & 0xFF
-        outbuff[4] = (addr >> 8) & 0xFF  # hi byte
-        outbuff[5] = addr & 0xFF  # lo byte
-        outbuff[6] = rlen
-        outbuff[7 : 7 + len(data)] = data
-        outbuff[-1] = self.calc_crc(outbuff)
+        # the CRC is the modular sum of the Len byte and of the payload,
+        # so only the data bytes need to be summed here
+        telegram = header + data + bytes([(header_sum + sum(data)) & 0xFF])
 
-        logging.debug(f"VS2: sending {outbuff.hex()}")
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug("VS2: sending %s", telegram.hex(" "))
 
         self.ser.reset_input_buffer()
-        if self.ser.write(outbuff) != len(outbuff):
+        if self.ser.write(telegram) != len(telegram):
             self.stats_by_receive_code[ErrorCode.WriteFailure] += 1
             return OptolinkVS2RxData(ErrorCode.WriteFailure, addr, bytearray())
 
@@ -335,9 +401,16 @@ class OptolinkVS2Protocol:
         ---------
         This function will block until the message has been fully received or a timeout has occurred.
         """
+        try:
+            return self._receive_telegram(resptelegr, raw)
+        finally:
+            # forward everything received to the secondary port with a single write
+            self._flush_ser2()
+
+    def _receive_telegram(self, resptelegr: bool, raw: bool) -> OptolinkVS2RxData:
         state = 0
-        inbuff = bytearray()
-        alldata = bytearray()
+        nrx = 0  # number of bytes received so far inside self._rx_buffer
+        start = 0  # position of the STX byte inside self._rx_buffer
         retdata = bytearray()
         addr = 0
         # msgid = 0x100  # message type identifier, byte 2 (3. byte; 0 = Request Message, 1 = Response Message, 2 = UNACKD Message, 3 = Error Message)
@@ -345,85 +418,89 @@ class OptolinkVS2Protocol:
         # fctcd = 0x100  # function code, low 5 bis of byte 3 (https://github.com/sarnau/InsideViessmannVitosoft/blob/main/VitosoftCommunication.md#defined-commandsfunction-codes)
         # dlen = -1
 
-        # for up 30x100ms serial data is read. (we do 600x5ms)
-        for _ in range(600):
-            time.sleep(0.005)
+        # for up 3sec serial data is read; rather than polling the serial port, block on it
+        # asking for exactly the number of bytes required by the current parser state, so that
+        # we wake up as soon as they have been received
+        deadline = time.monotonic() + OptolinkVS2Protocol.RX_TIMEOUT_SEC
+        while time.monotonic() < deadline:
+            # the ACK/NACK byte is asked alone, since nothing follows a NACK; then the STX and Len
+            # bytes are asked together and, once the Len byte is known, the rest of the telegram
+            # (STX + Len + Payload + CRC) is asked with a single read
+            nhdr = nrx - start
+            needed = (
+                1
+                if state == 0 and resptelegr
+                else (2 - nhdr if nhdr < 2 else self._rx_buffer[start + 1] + 3 - nhdr)
+            )
             try:
-                inbytes = self.ser.read_all()
-                if inbytes:
-                    inbuff += inbytes
-                    alldata += inbytes
-                    if self.ser2:
-                        self.ser2.write(inbytes)
-            except Exception:
+                # received bytes are stored directly in the preallocated RX buffer
+                nbytes = self._readinto_until_deadline(
+                    self._rx_view[nrx : nrx + needed], deadline
+                )
+                if nbytes and self.ser2:
+                    self._ser2_buffer += self._rx_view[nrx : nrx + nbytes]
+                nrx += nbytes
+            except serial.SerialException:
                 self.stats_by_receive_code[ErrorCode.SerialPortError] += 1
                 return OptolinkVS2RxData(ErrorCode.SerialPortError, 0, retdata)
 
             if state == 0:
                 if not resptelegr:
                     state = 1
-                elif len(inbuff) > 0:
+                elif nrx > 0:
                     if self.show_opto_rx:
-                        logging.debug(f"VS2 received: {inbuff.hex()}")
+                        logging.debug(f"VS2 received: {self._rx_buffer[:nrx].hex()}")
 
-                    if inbuff[0] == 0x06:  # VS2_ACK
+                    if self._rx_buffer[0] == 0x06:  # VS2_ACK
                         state = 1
                         # keep going...
 
-                    elif inbuff[0] == 0x15:  # VS2_NACK
+                    elif self._rx_buffer[0] == 0x15:  # VS2_NACK
                         logging.error("VS2 NACK Error")
                         self.stats_by_receive_code[ErrorCode.NACK] += 1
                         return OptolinkVS2RxData(
-                            ErrorCode.NACK,
-                            addr,
-                            alldata if not raw else bytearray(alldata),
+                            ErrorCode.NACK, addr, self._rx_buffer[:nrx]
                         )
                     else:
                         logging.error("VS2 unknown first byte error")
                         self.stats_by_receive_code[ErrorCode.Byte0UnknownError] += 1
                         return OptolinkVS2RxData(
-                            ErrorCode.Byte0UnknownError,
-                            addr,
-                            alldata if not raw else bytearray(alldata),
+                            ErrorCode.Byte0UnknownError, addr, self._rx_buffer[:nrx]
                         )
 
                     # Separate the first byte
-                    inbuff = inbuff[1:]
+                    start = 1
 
             # From this point on, the master request and slave response have an identical structure
             # (apart from error messages and such)
-            if state == 1 and len(inbuff) > 0:
+            if state == 1 and nrx > start:
                 if self.show_opto_rx:
-                    logging.debug(f"VS2 received: {inbuff.hex()}")
+                    logging.debug(f"VS2 received: {self._rx_buffer[start:nrx].hex()}")
 
-                if inbuff[0] != 0x41:  # STX
-                    logging.error(f"VS2 STX Error: {inbuff.hex()}")
+                if self._rx_buffer[start] != 0x41:  # STX
+                    logging.error(f"VS2 STX Error: {self._rx_buffer[start:nrx].hex()}")
                     # It might be necessary to wait for any remaining part of the telegram.
                     self.stats_by_receive_code[ErrorCode.STXError] += 1
                     return OptolinkVS2RxData(
-                        ErrorCode.STXError,
-                        addr,
-                        alldata if not raw else bytearray(alldata),
+                        ErrorCode.STXError, addr, self._rx_buffer[:nrx]
                     )
                 state = 2
 
-            if state == 2 and len(inbuff) > 1:
-                pllen = inbuff[1]
+            if state == 2 and nrx - start > 1:
+                pllen = self._rx_buffer[start + 1]
                 if pllen < 5:  # protocol_Id + MsgId|FnctCode + AddrHi + AddrLo + BlkLen
                     logging.error(f"VS2 Len Error: {pllen}")
                     self.stats_by_receive_code[ErrorCode.LengthError] += 1
                     return OptolinkVS2RxData(
-                        ErrorCode.LengthError,
-                        addr,
-                        alldata if not raw else bytearray(alldata),
+                        ErrorCode.LengthError, addr, self._rx_buffer[:nrx]
                     )
-                if len(inbuff) >= pllen + 3:  # STX + Len + Payload + CRC
+                if nrx - start >= pllen + 3:  # STX + Len + Payload + CRC
 
+                    # receive complete: slice the telegram out of the RX buffer, once
+                    inbuff = self._rx_buffer[start : start + pllen + 3]
                     if self.show_opto_rx:
                         logging.debug(f"VS2 received: {inbuff.hex()}")
 
-                    # receive complete
-                    inbuff = inbuff[: pllen + 4]  # make sure no tailing trash
                     msgid = inbuff[2] & 0x0F
                     # msqn = (inbuff[3] & 0xE0) >> 5
                     # fctcd = inbuff[3] & 0x1F
@@ -440,7 +517,7 @@ class OptolinkVS2Protocol:
                         return OptolinkVS2RxData(
                             ErrorCode.CRCError,
                             addr,
-                            retdata if not raw else bytearray(alldata),
+                            retdata if not raw else self._rx_buffer[:nrx],
                         )
 
                     if msgid == MessageIdentifier.ErrorMessage:
@@ -452,18 +529,22 @@ class OptolinkVS2Protocol:
                         return OptolinkVS2RxData(
                             ErrorCode.ErrorMessage,
                             addr,
-                            retdata if not raw else bytearray(alldata),
+                            retdata if not raw else self._rx_buffer[:nrx],
                         )
 
                     # successful receive!
-                    logging.debug(
-                        f"VS2 received successfully: address=0x{addr:02X} length={dlen} content[hex]={retdata.hex()}"
-                    )
+                    if logging.getLogger().isEnabledFor(logging.DEBUG):
+                        logging.debug(
+                            "VS2 received successfully: address=0x%02X length=%d content[hex]=%s",
+                            addr,
+                            dlen,
+                            retdata.hex(),
+                        )
                     self.stats_by_receive_code[ErrorCode.Success] += 1
                     return OptolinkVS2RxData(
                         ErrorCode.Success,
                         addr,
-                        retdata if not raw else bytearray(alldata),
+                        retdata if not raw else self._rx_buffer[:nrx],
                     )
 
         # timed-out if we get here
@@ -480,36 +561,77 @@ class OptolinkVS2Protocol:
     def receive_fullraw(
         self, eot_time: float, timeout: float
     ) -> tuple[ErrorCode, bytearray]:
-        inbuff = b""
-        start = time.time()
-        last_rx = start
+        try:
+            return self._receive_fullraw(eot_time, timeout)
+        finally:
+            self._flush_ser2()
+
+    def _receive_fullraw(
+        self, eot_time: float, timeout: float
+    ) -> tuple[ErrorCode, bytearray]:
+        inbuff = bytearray()
+        # deadlines are tracked as integer nanoseconds
+        eot_ns = int(eot_time * 1e9)
+        deadline_ns = time.monotonic_ns() + int(timeout * 1e9)
 
         while True:
-            inbytes = self.ser.read_all()
+            remaining_ns = deadline_ns - time.monotonic_ns()
+            if remaining_ns <= 0:
+                return ErrorCode.Timeout, inbuff
+
+            # till the first byte arrives, block for up to the whole timeout; afterwards block
+            # for up to eot_time, since a silence on the line longer than that marks the EOT
+            eot_wait = len(inbuff) > 0 and eot_ns < remaining_ns
+            self.ser.timeout = eot_time if eot_wait else remaining_ns / 1e9
+            inbytes = self.ser.read(max(1, self.ser.in_waiting))
             if inbytes:
                 # Add data to the data buffer
                 inbuff += inbytes
-                last_rx = time.time()
                 if self.ser2:
-                    self.ser2.write(inbytes)
-            elif inbuff and (time.time() - last_rx) > eot_time:
+                    self._ser2_buffer += inbytes
+                    if (
+                        len(self._ser2_buffer)
+                        >= OptolinkVS2Protocol.SER2_FLUSH_THRESHOLD
+                    ):
+                        self._flush_ser2()
+            elif eot_wait:
                 # if data received and no further receive since more than eot_time
-                return ErrorCode.Success, bytearray(inbuff)
-
-            if (time.time() - start) > timeout:
-                return ErrorCode.Timeout, bytearray(inbuff)
-
-            time.sleep(0.005)
+                return ErrorCode.Success, inbuff
 
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
 
+    def _readinto_until_deadline(self, buffer: memoryview, deadline: float) -> int:
+        """
+        Blocks till the given buffer has been filled or the 'deadline' (expressed in
+        time.monotonic() units) has expired. Returns the number of bytes received.
+        """
+        remaining_sec = deadline - time.monotonic()
+        if remaining_sec <= 0:
+            return 0
+        self.ser.timeout = remaining_sec
+        return self.ser.readinto(buffer)
+
+    def _flush_ser2(self) -> None:
+        """
+        Writes the bytes queued for the secondary serial port, if any.
+        """
+        if not self._ser2_buffer:
+            return
+        try:
+            self.ser2.write(self._ser2_buffer)
+        except serial.SerialException as e:
+            logging.error(
+                f"VS2: failed forwarding {len(self._ser2_buffer)}B to ser2: {e}"
+            )
+        self._ser2_buffer.clear()
+
     @staticmethod
     def calc_crc(telegram) -> int:
-        firstbyte = 1
+        # the VS2 "CRC" is just the 8bit modular sum of the Len byte and of the payload
         lastbyte = telegram[1] + 1
-        return sum(telegram[firstbyte : lastbyte + 1]) % 0x100
+        return sum(telegram[1 : lastbyte + 1]) & 0xFF
 
     # ------------------------------------------------------------------
     # Stats
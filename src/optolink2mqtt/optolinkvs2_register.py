@@ -18,11 +18,28 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-from typing import Dict, Any
+from typing import Callable, Dict, Any, Mapping
 
 # import hashlib
+import functools
 import json
 import logging
+import struct
+
+from .ha_support import HA_WRITABLE_PLATFORMS
+
+# orjson is an optional dependency: when available it's used to serialize the
+# HA discovery messages much faster than the standard json module
+try:
+    import orjson
+
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+
+except ImportError:
+
+    def _json_dumps(obj: Any) -> str:
+        return json.dumps(obj, separators=(",", ":"))
 
 
 class OptolinkVS2Register:
@@ -36,20 +53,91 @@ class OptolinkVS2Register:
     to be written into the device.
     """
 
+    # hundreds of registers are alive for the whole application lifetime: avoid a __dict__ for each
+    __slots__ = (
+        "name",
+        "sanitized_name",
+        "sampling_period_sec",
+        "mqtt_base_topic",
+        "_mqtt_state_topic",
+        "_mqtt_command_topic",
+        "address",
+        "length",
+        "signed",
+        "writable",
+        "scale_factor",
+        "byte_filter",
+        "enum_dict",
+        "_reverse_enum_dict",
+        "_byte_filter_slice",
+        "_value_length",
+        "_value_unpacker",
+        "_value_packer",
+        "_max_unsigned_value",
+        "_value_finisher",
+        "_value_decoder",
+        "_batch_format",
+        "ha_discovery",
+        "_ha_payload_base",
+        "_ha_payload_optionals",
+        "_ha_options",
+        "_ha_unique_id_suffix",
+        "_ha_discovery_topic_template",
+    )
+
     MAX_DECIMALS = 2
 
+    # parameters that are optionals from optolink2mqtt perspective:
+    # note that HomeAssistant might require some of them depending on the 'platform' used
+    HA_OPTIONAL_PARAMETERS = (
+        "icon",
+        "device_class",
+        "state_class",
+        "unit_of_measurement",
+        "entity_category",
+        "payload_on",
+        "payload_off",
+        "availability_topic",
+        "payload_available",
+        "payload_not_available",
+        "min",
+        "max",
+        "step",
+        "mode",
+        "optimistic",
+    )
+
+    # translation table used to sanitize register names: separators become underscores,
+    # brackets and quotes are dropped
+    SANITIZE_TABLE = str.maketrans(" -/\\.,;:", "________", "()[]{}\"'")
+
+    # struct formats for decoding the most common register lengths, keyed by (length, signed)
+    VALUE_STRUCT_FORMATS = {
+        (1, False): "<B",
+        (1, True): "<b",
+        (2, False): "<H",
+        (2, True): "<h",
+        (4, False): "<I",
+        (4, True): "<i",
+        (8, False): "<Q",
+        (8, True): "<q",
+    }
+
     def __init__(
         self,
-        reg: Dict[str, Any],
+        reg: Mapping[str, Any],
         mqtt_base_topic: str,
     ):
         # basic metadata
         self.name = reg["name"]
         self.sanitized_name = self._sanitize_name(self.name)
-        self.sampling_period_sec = reg["sampling_period_seconds"]
+        self.sampling_period_sec = int(reg["sampling_period_seconds"])
         self.mqtt_base_topic = mqtt_base_topic
         if self.mqtt_base_topic.endswith("/"):
             self.mqtt_base_topic = self.mqtt_base_topic[:-1]
+        # the MQTT topics never change, so they're built only once
+        self._mqtt_state_topic = f"{self.mqtt_base_topic}/{self.sanitized_name}"
+        self._mqtt_command_topic = f"{self._mqtt_state_topic}/set"
 
         # register definition
         self.address = int(reg["register"])
@@ -59,34 +147,103 @@ class OptolinkVS2Register:
         self.scale_factor = float(reg["scale_factor"])
         self.byte_filter = str(reg["byte_filter"])
         self.enum_dict = reg["enum"]
+        # reverse lookup table, used when writing enum registers
+        self._reverse_enum_dict = (
+            {v: k for k, v in self.enum_dict.items()}
+            if self.enum_dict is not None
+            else None
+        )
+
+        # the byte filter is parsed only once; it selects the bytes holding the actual value
+        # (enum registers are always decoded from their whole raw data)
+        self._byte_filter_slice = (
+            self._parse_byte_filter(reg["byte_filter"])
+            if self.enum_dict is None
+            else None
+        )
+        self._value_length = len(
+            range(self.length)[self._byte_filter_slice or slice(None)]
+        )
+
+        # precompiled decoder for the value raw data, if its length is a common one
+        fmt = OptolinkVS2Register.VALUE_STRUCT_FORMATS.get(
+            (self._value_length, self.signed)
+        )
+        self._value_unpacker = struct.Struct(fmt).unpack_from if fmt else None
+
+        # precompiled encoder for values written into the whole register
+        write_fmt = OptolinkVS2Register.VALUE_STRUCT_FORMATS.get(
+            (self.length, self.signed)
+        )
+        self._value_packer = struct.Struct(write_fmt).pack if write_fmt else None
+
+        # max value of the register when read as unsigned, used to spot signedness mistakes
+        self._max_unsigned_value = (1 << (8 * self.length)) - 1
+
+        # decoder specialized for the shape of this register
+        self._value_finisher = self._make_value_finisher()
+        self._value_decoder = self._make_value_decoder()
+
+        # struct format used by decode_batch() for the whole raw data of this register
+        self._batch_format = self._make_batch_format(fmt)
 
         # optional Home Assistant discovery configuration
         self.ha_discovery = reg["ha_discovery"]
+        self._ha_payload_base = None
+        self._ha_payload_optionals = None
+        self._ha_options = None
+        self._ha_discovery_topic_template = None
+        # the unique ID only depends on the device name, besides the register definition
+        sanitized_address = self.address.to_bytes(2, "little").hex()
+        self._ha_unique_id_suffix = f"-{self.sanitized_name}-{sanitized_address}"
         if self.ha_discovery is not None:
             self.check_ha_discovery_validity()
 
+            # the topic shall be in format
+            #   <discovery_prefix>/<component>/[<node_id>/]<object_id>/config
+            # where
+            #   "component" is the platform (sensor, switch, select, number, etc.)
+            #   "node_id" is the name of the device that groups all the entities
+            #   "object_id" is an ID unique inside the component
+            # see https://www.home-assistant.io/integrations/mqtt/#discovery-topic
+            self._ha_discovery_topic_template = (
+                "{ha_topic}/"
+                + self.ha_discovery["platform"]
+                + "/{device_name}/{device_name}"
+                + self._ha_unique_id_suffix
+                + "/config"
+            )
+
+            # the part of the discovery message that depends only on the register definition
+            self._ha_payload_base = {
+                "name": self.ha_discovery["name"],
+                # the state topic is always populated as it's mandatory for all platforms
+                "state_topic": self._mqtt_state_topic,
+            }
+            # "command_topic" is populated only for platforms that allow HomeAssistant to send commands / write values:
+            if self.writable:
+                self._ha_payload_base["command_topic"] = self._mqtt_command_topic
+
+            # the optional parameters actually set in the configuration file
+            self._ha_payload_optionals = {
+                o: self.ha_discovery[o]
+                for o in OptolinkVS2Register.HA_OPTIONAL_PARAMETERS
+                if self.ha_discovery.get(o)
+            }
+
+            # "options" field is populated only for "select" and "sensor" platform with enum_dict defined
+            if (
+                self.ha_discovery["platform"] in ("select", "sensor")
+                and self.enum_dict is not None
+            ):
+                self._ha_options = list(self.enum_dict.values())
+
     def _sanitize_name(self, name: str) -> str:
         """
         Returns a sanitized version of the given name, suitable to be used as MQTT topic part
         or HomeAssistant unique ID part.
         """
-        sanitized = name.lower()
-        sanitized = sanitized.replace(" ", "_")
-        sanitized = sanitized.replace("-", "_")
-        sanitized = sanitized.replace("/", "_")
-        sanitized = sanitized.replace("\\", "_")
-        sanitized = sanitized.replace(".", "_")
-        sanitized = sanitized.replace(",", "_")
-        sanitized = sanitized.replace(";", "_")
-        sanitized = sanitized.replace(":", "_")
-        sanitized = sanitized.replace("(", "")
-        sanitized = sanitized.replace(")", "")
-        sanitized = sanitized.replace("[", "")
-        sanitized = sanitized.replace("]", "")
-        sanitized = sanitized.replace("{", "")
-        sanitized = sanitized.replace("}", "")
-        sanitized = sanitized.replace('"', "")
-        sanitized = sanitized.replace("'", "")
+        sanitized = name.lower().translate(OptolinkVS2Register.SANITIZE_TABLE)
 
         sanitized = sanitized.replace("__", "_")
         sanitized = sanitized.strip("_")
@@ -107,7 +264,9 @@ class OptolinkVS2Register:
         """
         return self.sampling_period_sec
 
-    def get_value_from_rawdata(self, rawdata: bytearray) -> str | int | float | None:
+    def get_value_from_rawdata(
+        self, rawdata: bytes | bytearray
+    ) -> str | int | float | None:
         """
         Returns the value of the register from the given raw data.
         NOTE: This function was named "bytesval" in original optolink-splitter codebase.
@@ -117,32 +276,137 @@ class OptolinkVS2Register:
         In case of invalid conversion, None is returned.
         """
 
+        return self._value_decoder(rawdata)
+
+    def _make_value_decoder(self) -> Callable[[bytes | bytearray], str | int | float]:
+        """
+        Returns the function used by get_value_from_rawdata() to decode the raw data.
+        The register definition never changes after construction, so all decisions
+        depending on it (enum, scale factor, signedness check) are taken only once here
+        instead of at every sample.
+        """
+        decode_int = self._decode_int
+        finish = self._value_finisher
+        byte_filter_slice = self._byte_filter_slice
+
+        if byte_filter_slice is not None:
+
+            def decode_filtered(rawdata: bytes | bytearray) -> int | float:
+                rawdata = rawdata[byte_filter_slice]
+                return finish(decode_int(rawdata), rawdata)
+
+            return decode_filtered
+
+        def decode(rawdata: bytes | bytearray) -> str | int | float:
+            return finish(decode_int(rawdata), rawdata)
+
+        return decode
+
+    def _make_value_finisher(
+        self,
+    ) -> Callable[[int, bytes | bytearray], str | int | float]:
+        """
+        Returns the function turning the integer decoded from the raw data into the
+        register value, i.e. looking up the enum or applying the scale factor.
+        """
         if self.enum_dict is not None:
-            val = int.from_bytes(rawdata, byteorder="little", signed=self.signed)
-            return self.enum_dict.get(val, f"Unknown ({val})")
-        else:
-            if self.byte_filter is not None:
-                # apply byte filter
-                parts = self.byte_filter.split(":")
-                if parts[0] == "b" and len(parts) == 3:
-                    start = int(parts[1])
-                    end = int(parts[2]) + 1  # inclusive
-                    rawdata = rawdata[start:end]
-
-            val = int.from_bytes(rawdata, byteorder="little", signed=self.signed)
-
-            if not self.signed:
-                maxpossible_value = int.from_bytes(
-                    [0xFF] * self.length, byteorder="little", signed=False
+            enum_dict = self.enum_dict
+
+            def finish_enum(val: int, rawdata: bytes | bytearray) -> str:
+                # format the fallback string only for values missing from the enum
+                name = enum_dict.get(val)
+                if name is None:
+                    return f"Unknown ({val})"
+                return name
+
+            return finish_enum
+
+        # an unsigned value close to the max possible one is suspicious
+        suspicious_threshold = None if self.signed else self._max_unsigned_value * 0.9
+        scale_factor = self.scale_factor if self.scale_factor != 1.0 else None
+
+        def finish(val: int, rawdata: bytes | bytearray) -> int | float:
+            if suspicious_threshold is not None and val > suspicious_threshold:
+                logging.warning(
+                    f"Register '{self.name}' read value {rawdata.hex()} is suspiciously close to the max possible value {self._max_unsigned_value} for a {self.length}-long register, which might indicate a SIGNED value was read in a register declared as UNSIGNED. Did you forget to declare this register as SIGNED?"
                 )
-                if val > maxpossible_value * 0.9:
-                    logging.warning(
-                        f"Register '{self.name}' read value {rawdata.hex()} is suspiciously close to the max possible value {maxpossible_value} for a {self.length}-long register, which might indicate a SIGNED value was read in a register declared as UNSIGNED. Did you forget to declare this register as SIGNED?"
-                    )
 
-            if self.scale_factor != 1.0:
-                val = round(val * self.scale_factor, OptolinkVS2Register.MAX_DECIMALS)
-        return val
+            if scale_factor is not None:
+                val = round(val * scale_factor, OptolinkVS2Register.MAX_DECIMALS)
+            return val
+
+        return finish
+
+    def _make_batch_format(self, value_format: str | None) -> str | None:
+        """
+        Returns the struct format (without byte order prefix) decoding the whole raw data
+        of this register: the bytes discarded by the byte filter become pad bytes.
+        Returns None if the value cannot be decoded by the struct module.
+        """
+        if value_format is None:
+            return None
+        if self._byte_filter_slice is None:
+            return value_format[1:]
+        start, stop, _ = self._byte_filter_slice.indices(self.length)
+        return "x" * start + value_format[1:] + "x" * (self.length - stop)
+
+    @classmethod
+    def decode_batch(
+        cls, regs: list["OptolinkVS2Register"], rawdatas: list[bytes | bytearray]
+    ) -> list[str | int | float | None]:
+        """
+        Returns the values of the given registers from their raw data; the result is the same
+        of invoking get_value_from_rawdata() on each register, but the raw data of all
+        registers having a length supported by the struct module (including enum and
+        byte-filtered ones) is decoded with a single struct.unpack() call.
+        """
+        values = [None] * len(regs)
+        batch_indexes = []
+        for i, (reg, rawdata) in enumerate(zip(regs, rawdatas)):
+            if reg._batch_format is not None and len(rawdata) == reg.length:
+                batch_indexes.append(i)
+            else:
+                values[i] = reg.get_value_from_rawdata(rawdata)
+
+        if batch_indexes:
+            batch_struct = cls._get_batch_struct(
+                "".join(regs[i]._batch_format for i in batch_indexes)
+            )
+            ints = batch_struct.unpack(b"".join(rawdatas[i] for i in batch_indexes))
+            for i, val in zip(batch_indexes, ints):
+                values[i] = regs[i]._value_finisher(val, rawdatas[i])
+        return values
+
+    @staticmethod
+    @functools.lru_cache(maxsize=64)
+    def _get_batch_struct(batch_format: str) -> struct.Struct:
+        """
+        Returns the compiled struct for the given batch format.
+        Registers are sampled over and over in the same groups, so only a few
+        distinct batch formats exist and each one is compiled only once.
+        """
+        return struct.Struct("<" + batch_format)
+
+    @staticmethod
+    def _parse_byte_filter(byte_filter: str | None) -> slice | None:
+        """
+        Parses a byte filter in the form "b:<first byte>:<last byte>" into the slice
+        selecting those bytes from the raw data. Returns None if no byte filter is set.
+        """
+        if byte_filter is None:
+            return None
+        parts = str(byte_filter).split(":")
+        if parts[0] == "b" and len(parts) == 3:
+            return slice(int(parts[1]), int(parts[2]) + 1)  # inclusive
+        return None
+
+    def _decode_int(self, rawdata: bytes | bytearray) -> int:
+        """
+        Decodes the given little-endian raw data into an integer.
+        """
+        if self._value_unpacker is not None and len(rawdata) == self._value_length:
+            return self._value_unpacker(rawdata)[0]
+        return int.from_bytes(rawdata, byteorder="little", signed=self.signed)
 
     def get_rawdata_from_value(self, str_value: str) -> bytearray | None:
         """
@@ -153,13 +417,12 @@ class OptolinkVS2Register:
         val = 0
         if self.enum_dict is not None:
             # reverse lookup in enum dict
-            reverse_enum = {v: k for k, v in self.enum_dict.items()}
-            if str_value not in reverse_enum:
+            val = self._reverse_enum_dict.get(str_value)
+            if val is None:
                 logging.error(
                     f"Invalid value '{str_value}' for register '{self.name}'; valid values are: {list(self.enum_dict.values())}"
                 )
                 return None
-            val = reverse_enum[str_value]
         else:
             # normal numeric value
             if self.scale_factor != 1.0:
@@ -171,7 +434,7 @@ class OptolinkVS2Register:
                 )
             else:
                 val = int(str_value)
-        rawdata = val.to_bytes(self.length, byteorder="little", signed=self.signed)
+        rawdata = self._encode_int(val)
         if len(rawdata) != self.length:
             logging.error(
                 f"Value '{str_value}' for register '{self.name}' cannot be represented in {self.length} bytes."
@@ -180,15 +443,29 @@ class OptolinkVS2Register:
 
         return bytearray(rawdata)
 
+    def _encode_int(self, val: int) -> bytes:
+        """
+        Encodes the given integer into little-endian raw data as long as the register.
+        Raises OverflowError if the value does not fit the register.
+        """
+        if self._value_packer is not None:
+            try:
+                return self._value_packer(val)
+            except struct.error as e:
+                raise OverflowError(
+                    f"value {val} does not fit a {self.length}-byte register"
+                ) from e
+        return val.to_bytes(self.length, byteorder="little", signed=self.signed)
+
     #
     # MQTT helpers
     #
 
     def get_mqtt_state_topic(self) -> str:
-        return f"{self.mqtt_base_topic}/{self.sanitized_name}"
+        return self._mqtt_state_topic
 
     def get_mqtt_command_topic(self) -> str:
-        return f"{self.mqtt_base_topic}/{self.sanitized_name}/set"
+        return self._mqtt_command_topic
 
     #
     # MQTT/HomeAssistant Discovery Message helpers
@@ -214,23 +491,18 @@ class OptolinkVS2Register:
                 f"Register '{self.name}' has invalid HA discovery 'platform' property."
             )
 
-        HA_PLATFORMS_WRITABLE = ["switch", "select", "number"]
-
-        if self.writable and self.ha_discovery["platform"] not in HA_PLATFORMS_WRITABLE:
-            raise Exception(
-                f"Register '{self.name}' is writable but has incompatible HA discovery 'platform' property '{self.ha_discovery['platform']}'."
-            )
-        if not self.writable and self.ha_discovery["platform"] in HA_PLATFORMS_WRITABLE:
+        # writable registers require a writable platform and vice versa
+        if (self.ha_discovery["platform"] in HA_WRITABLE_PLATFORMS) != self.writable:
+            writable_desc = "writable" if self.writable else "not writable"
             raise Exception(
-                f"Register '{self.name}' is not writable but has incompatible HA discovery 'platform' property '{self.ha_discovery['platform']}'."
+                f"Register '{self.name}' is {writable_desc} but has incompatible HA discovery 'platform' property '{self.ha_discovery['platform']}'."
             )
 
     def get_ha_unique_id(self, device_name: str) -> str:
         """
         Returns a reasonable-unique ID to be used inside HA discovery messages
         """
-        sanitized_address = self.address.to_bytes(2, "little").hex()
-        return f"{device_name}-{self.sanitized_name}-{sanitized_address}"
+        return device_name + self._ha_unique_id_suffix
 
     def get_ha_discovery_payload(
         self,
@@ -248,55 +520,37 @@ class OptolinkVS2Register:
         if self.ha_discovery is None:
             return None
 
+        return _json_dumps(
+            self._build_ha_discovery_dict(
+                device_name, optolink2mqtt_ver, device_dict, default_expire_after
+            )
+        )
+
+    def _build_ha_discovery_dict(
+        self,
+        device_name: str,
+        optolink2mqtt_ver: str,
+        device_dict: Dict[str, str],
+        default_expire_after: int,
+    ) -> Dict[str, Any]:
+        """
+        Returns the HomeAssistant MQTT discovery message serialized by get_ha_discovery_payload()
+        """
         # basic MQTT discovery message structure:
-        msg = {
-            "name": self.ha_discovery["name"],
-            "device": device_dict,
-            "origin": {
-                "name": "optolink2mqtt",
-                "sw": optolink2mqtt_ver,
-                "url": "https://github.com/f18m/viessmann-optolink2mqtt",
-            },
-            # unique_id is required when used with device-based discovery
-            "unique_id": self.get_ha_unique_id(device_name),
-            # the state topic is always populated as it's mandatory for all platforms
-            "state_topic": self.get_mqtt_state_topic(),
+        msg = self._ha_payload_base.copy()
+        msg["device"] = device_dict
+        msg["origin"] = {
+            "name": "optolink2mqtt",
+            "sw": optolink2mqtt_ver,
+            "url": "https://github.com/f18m/viessmann-optolink2mqtt",
         }
+        # unique_id is required when used with device-based discovery
+        msg["unique_id"] = self.get_ha_unique_id(device_name)
+
+        msg.update(self._ha_payload_optionals)
 
-        # parameters that are optionals from optolink2mqtt perspective:
-        # note that HomeAssistant might require some of them depending on the 'platform' used
-        optional_parameters = [
-            "icon",
-            "device_class",
-            "state_class",
-            "unit_of_measurement",
-            "entity_category",
-            "payload_on",
-            "payload_off",
-            "availability_topic",
-            "payload_available",
-            "payload_not_available",
-            "min",
-            "max",
-            "step",
-            "mode",
-            "optimistic",
-        ]
-        for o in optional_parameters:
-            if o in self.ha_discovery and self.ha_discovery[o]:
-                msg[o] = self.ha_discovery[o]
-
-        # "options" field is populated only for "select" and "sensor" platform with enum_dict defined
-        if (
-            self.ha_discovery["platform"] == "select"
-            or self.ha_discovery["platform"] == "sensor"
-        ):
-            if self.enum_dict is not None:
-                msg["options"] = list(self.enum_dict.values())
-
-        # "command_topic" is populated only for platforms that allow HomeAssistant to send commands / write values:
-        if self.writable:
-            msg["command_topic"] = self.get_mqtt_command_topic()
+        if self._ha_options is not None:
+            msg["options"] = self._ha_options
 
         # expire_after is populated with user preference or a meaningful default value:
         if self.ha_discovery["expire_after"]:
@@ -304,18 +558,12 @@ class OptolinkVS2Register:
         elif default_expire_after:
             msg["expire_after"] = default_expire_after
 
-        return json.dumps(msg)
+        return msg
 
     def get_ha_discovery_topic(self, ha_topic: str, device_name: str) -> str:
         """
         Returns the TOPIC associated with the PAYLOAD returned by get_ha_discovery_payload()
         """
-        # the topic shall be in format
-        #   <discovery_prefix>/<component>/[<node_id>/]<object_id>/config
-        # where
-        #   "component" is the platform (sensor, switch, select, number, etc.)
-        #   "node_id" is the name of the device that groups all the entities
-        #   "object_id" is an ID unique inside the component
-        # see https://www.home-assistant.io/integrations/mqtt/#discovery-topic
-        unique_id = self.get_ha_unique_id(device_name)
-        return f"{ha_topic}/{self.ha_discovery['platform']}/{device_name}/{unique_id}/config"
+        return self._ha_discovery_topic_template.format(
+            ha_topic=ha_topic, device_name=device_name
+        )
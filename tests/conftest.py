@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Shared pytest fixtures for the optolink2mqtt unit tests
+"""
+
+from collections import deque
+import time
+
+import pytest
+
+# a read-only, 1-byte, unsigned register without any optional feature;
+# tests override only the keys relevant for them
+REG_DATA_DEFAULTS = {
+    "name": "Test",
+    "sampling_period_seconds": 60,
+    "register": 0x0000,
+    "length": 1,
+    "signed": False,
+    "writable": False,
+    "scale_factor": 1.0,
+    "byte_filter": None,
+    "enum": None,
+    "ha_discovery": None,
+}
+
+# HomeAssistant discovery configuration with all optional properties unset
+HA_DISCOVERY_DEFAULTS = {
+    "name": "Test",
+    "platform": "sensor",
+    "device_class": None,
+    "state_class": None,
+    "unit_of_measurement": None,
+    "icon": None,
+    "payload_on": None,
+    "payload_off": None,
+    "availability_topic": None,
+    "payload_available": None,
+    "payload_not_available": None,
+    "expire_after": None,
+}
+
+
+# the factories are stateless, so they can be shared by fixtures of any scope
+@pytest.fixture(scope="session")
+def make_reg_data():
+    """Factory of register definitions, as loaded from the configuration file"""
+
+    def _make(**overrides):
+        return {**REG_DATA_DEFAULTS, **overrides}
+
+    return _make
+
+
+@pytest.fixture(scope="session")
+def make_ha_discovery():
+    """Factory of HomeAssistant discovery configurations"""
+
+    def _make(**overrides):
+        return {**HA_DISCOVERY_DEFAULTS, **overrides}
+
+    return _make
+
+
+@pytest.fixture(scope="session")
+def make_reg(make_reg_data):
+    """Factory of registers published under the "home/device" MQTT base topic"""
+    # imported here as the sys.path tweak is done by the test modules
+    from optolink2mqtt.optolinkvs2_register import OptolinkVS2Register
+
+    def _make(**overrides):
+        return OptolinkVS2Register(make_reg_data(**overrides), "home/device")
+
+    return _make
+
+
+class FakeSerial:
+    """
+    In-process replacement of serial.Serial, talking to a scripted device:
+    every telegram written is looked up in the script and the associated
+    response (if any) becomes available for reading.
+
+    Like a real port, a read asking for more bytes than available waits for
+    the whole timeout: the wait happens on a fake clock, exposed by monotonic(),
+    so that timeouts are exercised without sleeping nor busy-looping.
+    """
+
+    def __init__(self, script: dict[bytes, bytes]):
+        self.script = dict(script)
+        self.written = []
+        self.timeout = None
+        self.is_open = True
+        self.clock = 0.0
+        self.num_reads = 0
+        self._rx = deque()
+
+    def monotonic(self) -> float:
+        return self.clock
+
+    def open(self):
+        self.is_open = True
+
+    def close(self):
+        self.is_open = False
+
+    def reset_input_buffer(self):
+        self._rx.clear()
+
+    @property
+    def in_waiting(self) -> int:
+        return len(self._rx)
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.written.append(data)
+        self._rx.extend(self.script.get(data, b""))
+        return len(data)
+
+    def read(self, size: int = 1) -> bytes:
+        self.num_reads += 1
+        if len(self._rx) < size:
+            if self.timeout is None:
+                raise RuntimeError("blocking read without timeout would hang forever")
+            self.clock += self.timeout
+        return bytes(self._rx.popleft() for _ in range(min(size, len(self._rx))))
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+@pytest.fixture
+def fake_serial(monkeypatch):
+    """
+    FakeSerial scripted for the VS2 initialization handshake; tests add their own telegrams.
+    time.monotonic() follows the FakeSerial clock for the duration of the test.
+    """
+    ser = FakeSerial(
+        {
+            bytes([0x04]): bytes([0x05]),  # EOT -> ENQ
+            bytes([0x16, 0x00, 0x00]): bytes([0x06]),  # START_VS2 -> ACK
+        }
+    )
+    monkeypatch.setattr(time, "monotonic", ser.monotonic)
+    return ser
@@ -1,68 +1,170 @@
 #!/usr/bin/env python3
+"""
+Unit tests for OptolinkVS2Protocol class
+
+Tests run against a mocked serial port; see manual_optolinkvs2_protocol.py
+for a test against a real device.
+"""
 
 import sys
-import time
-import serial
 import os
-import logging
+from unittest.mock import MagicMock
 
-# load most updated code living in the parent dir ../src/optolink2mqtt
+import pytest
+import serial
+
+# load code living in the parent dir ../src/optolink2mqtt
 THIS_SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
 SRC_DIR = os.path.realpath(THIS_SCRIPT_DIR + "/../src")
 sys.path.append(SRC_DIR)
-from optolink2mqtt.optolinkvs2_protocol import OptolinkVS2Protocol  # noqa: E402
 
-# --------------------
-# main for test only
-# --------------------
+from optolink2mqtt.optolinkvs2_protocol import (  # noqa: E402
+    ErrorCode,
+    FunctionCodes,
+    OptolinkVS2Protocol,
+    OptolinkVS2RxData,
+)
+
+
+class TestOptolinkVS2ProtocolInit:
+    """Tests for the VS2 initialization handshake"""
+
+    def test_init_vs2(self):
+        """Test the EOT / ENQ / START_VS2 / ACK handshake"""
+        replies = iter([0x05, 0x06])  # ENQ, ACK
+
+        def fake_readinto(buffer):
+            buffer[0] = next(replies)
+            return 1
+
+        ser = MagicMock(spec=serial.Serial)
+        ser.readinto.side_effect = fake_readinto
+        proto = OptolinkVS2Protocol(ser)
 
-PORT = "/dev/ttyUSB0"
-logging.basicConfig(level=logging.DEBUG, force=True)
+        assert proto.init_vs2() is True
+        written = [c.args[0] for c in ser.write.call_args_list]
+        assert written == [bytes([0x04]), bytes([0x16, 0x00, 0x00])]
 
+    def test_init_vs2_timeout(self):
+        """Test the handshake fails when the device never answers"""
+        ser = MagicMock(spec=serial.Serial)
+        ser.readinto.return_value = 0
+        proto = OptolinkVS2Protocol(ser)
 
-class OptolinkVS2ProtocolTest:
+        assert proto.init_vs2() is False
 
-    def is_serial_port_avail():
-        if os.path.isfile(PORT):
-            return True
-        else:
-            return False
 
-    def test_datapoint_read(self):
-        if not OptolinkVS2ProtocolTest.is_serial_port_avail():
-            # only execute this test if the serial port is available
-            return
+def make_response(fctcode: int, addr: int, data: bytes) -> bytes:
+    """Returns the ACK + response telegram sent by the device for a datapoint request"""
+    telegram = bytearray([0x41, 5 + len(data), 0x01, fctcode, addr >> 8, addr & 0xFF])
+    telegram += bytes([len(data)]) + data
+    telegram.append(OptolinkVS2Protocol.calc_crc(telegram))
+    return bytes([0x06]) + telegram
 
-        ser = serial.Serial(
-            PORT, baudrate=4800, bytesize=8, parity="E", stopbits=2, timeout=0
+
+class TestOptolinkVS2ProtocolDatapoints:
+    """Tests for datapoint reads and writes against a scripted device"""
+
+    def test_init_vs2_fake_serial(self, fake_serial):
+        """Test the VS2 initialization handshake with the scripted device"""
+        proto = OptolinkVS2Protocol(fake_serial)
+
+        assert proto.init_vs2() is True
+
+    def test_read_datapoint(self, fake_serial):
+        """Test reading an 8-byte datapoint"""
+        data = bytes(range(1, 9))
+        request = OptolinkVS2Protocol._build_read_frame(0x00F8, 8)
+        fake_serial.script[request] = make_response(
+            FunctionCodes.Virtual_READ, 0x00F8, data
         )
-        proto = OptolinkVS2Protocol(ser, show_opto_rx=True)
-        try:
-            if not ser.is_open:
-                ser.open()
-            if not proto.init_vs2():
-                raise Exception("init_vs2 failed")
-
-            logging.info(f"VS2 protocol successfully initialized on port {PORT}")
-
-            # read test
-            i = 0
-            while i < 4:
-                logging.info("Reading test datapoint 0x00F8...")
-                rxdata = proto.read_datapoint_ext(0x00F8, 8)
-                if rxdata.is_successful():
-                    logging.info(f"Datapoint content is: {rxdata.data.hex()}")
-                else:
-                    logging.error(
-                        f"Error reading datapoint: code {rxdata.retcode:#02x}"
-                    )
-                time.sleep(0.5)
-                i += 1
-        except Exception as e:
-            logging.error(e)
-        finally:
-            if ser.is_open:
-                logging.info("exit close")
-                # re-init KW protocol
-                ser.write(bytes([0x04]))
-                ser.close()
+        proto = OptolinkVS2Protocol(fake_serial)
+
+        rxdata = proto.read_datapoint_ext(0x00F8, 8)
+        assert rxdata.is_successful()
+        assert rxdata.address == 0x00F8
+        assert rxdata.data == data
+        assert fake_serial.written == [request]
+        assert proto.get_total_rx_frames() == 1
+
+    def test_write_datapoint(self, fake_serial):
+        """Test writing a 2-byte datapoint"""
+        request = bytes([0x41, 0x07, 0x00, 0x02, 0x23, 0x23, 0x02, 0x34, 0x12, 0x97])
+        fake_serial.script[request] = make_response(
+            FunctionCodes.Virtual_WRITE, 0x2323, b""
+        )
+        proto = OptolinkVS2Protocol(fake_serial)
+
+        rxdata = proto.write_datapoint_ext(0x2323, b"\x34\x12")
+        assert rxdata.is_successful()
+        assert fake_serial.written == [request]
+
+    def test_read_datapoint_nack(self, fake_serial):
+        """Test a datapoint read refused by the device"""
+        request = OptolinkVS2Protocol._build_read_frame(0x00F8, 2)
+        fake_serial.script[request] = bytes([0x15])
+        proto = OptolinkVS2Protocol(fake_serial)
+
+        assert proto.read_datapoint_ext(0x00F8, 2).receive_code == ErrorCode.NACK
+
+    def test_read_datapoint_crc_error(self, fake_serial):
+        """Test a datapoint read whose response is corrupted"""
+        request = OptolinkVS2Protocol._build_read_frame(0x00F8, 2)
+        response = bytearray(
+            make_response(FunctionCodes.Virtual_READ, 0x00F8, b"\x20\xcb")
+        )
+        response[-1] ^= 0xFF
+        fake_serial.script[request] = bytes(response)
+        proto = OptolinkVS2Protocol(fake_serial)
+
+        assert proto.read_datapoint_ext(0x00F8, 2).receive_code == ErrorCode.CRCError
+
+    def test_read_datapoint_timeout(self, fake_serial):
+        """Test a datapoint read the device never answers to"""
+        proto = OptolinkVS2Protocol(fake_serial)
+
+        assert proto.read_datapoint_ext(0x00F8, 2).receive_code == ErrorCode.Timeout
+        # a single read blocks for the whole receive timeout: no busy-looping
+        assert fake_serial.num_reads == 1
+        assert fake_serial.clock == OptolinkVS2Protocol.RX_TIMEOUT_SEC
+
+    def test_init_vs2_fake_serial_timeout(self, fake_serial):
+        """Test the handshake fails after INIT_TIMEOUT_SEC when ENQ never arrives"""
+        del fake_serial.script[bytes([0x04])]
+        proto = OptolinkVS2Protocol(fake_serial)
+
+        assert proto.init_vs2() is False
+        assert fake_serial.num_reads == 1
+        assert fake_serial.clock == OptolinkVS2Protocol.INIT_TIMEOUT_SEC
+
+    def test_read_datapoints_batch(self, fake_serial):
+        """Test a batch read returns the same results of individual reads"""
+        datapoints = {0x00F8: b"\x20\xcb", 0x0800: b"\x9c\xff", 0x2323: b"\x01"}
+        for addr, data in datapoints.items():
+            request = OptolinkVS2Protocol._build_read_frame(addr, len(data))
+            fake_serial.script[request] = make_response(
+                FunctionCodes.Virtual_READ, addr, data
+            )
+        requests = [(addr, len(data)) for addr, data in datapoints.items()]
+        proto = OptolinkVS2Protocol(fake_serial)
+
+        batch = proto.read_datapoints_batch(requests)
+        single = [proto.read_datapoint_ext(addr, rdlen) for addr, rdlen in requests]
+
+        assert [(r.receive_code, r.address, r.data) for r in batch] == [
+            (r.receive_code, r.address, r.data) for r in single
+        ]
+        assert [r.data for r in batch] == list(datapoints.values())
+
+
+class TestOptolinkVS2RxData:
+    """Tests for the received telegram container"""
+
+    def test_no_instance_dict(self):
+        """Test that received telegrams use __slots__ and reject unknown attributes"""
+        rxdata = OptolinkVS2RxData(ErrorCode.Success, 0x00F8, bytearray(b"\x01"))
+
+        assert rxdata.is_successful()
+        assert not hasattr(rxdata, "__dict__")
+        with pytest.raises(AttributeError):
+            rxdata.return_code = ErrorCode.Success
@@ -8,6 +8,8 @@ and HomeAssistant discovery functionality.
 
 import sys
 import os
+import pytest
+from types import MappingProxyType
 
 # load code living in the parent dir ../src/optolink2mqtt
 THIS_SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
@@ -21,23 +23,19 @@ from optolink2mqtt.optolinkvs2_register import OptolinkVS2Register  # noqa: E402
 #
 
 
+@pytest.fixture(scope="module")
+def heater_reg(make_reg_data):
+    """Read-only register shared by the tests that only query it"""
+    reg_data = make_reg_data(name="Living Room Temperature", length=2)
+    return OptolinkVS2Register(reg_data, "home/heater")
+
+
 class TestOptolinkVS2RegisterInit:
     """Tests for OptolinkVS2Register initialization"""
 
-    def test_basic_initialization(self):
+    def test_basic_initialization(self, make_reg_data):
         """Test basic register initialization with minimal parameters"""
-        reg_data = {
-            "name": "Test Register",
-            "sampling_period_seconds": 60,
-            "register": 0x1234,
-            "length": 2,
-            "signed": False,
-            "writable": False,
-            "scale_factor": 1.0,
-            "byte_filter": None,
-            "enum": None,
-            "ha_discovery": None,
-        }
+        reg_data = make_reg_data(name="Test Register", register=0x1234, length=2)
         reg = OptolinkVS2Register(reg_data, "home/device")
 
         assert reg.name == "Test Register"
@@ -49,46 +47,49 @@ class TestOptolinkVS2RegisterInit:
         assert reg.writable is False
         assert reg.scale_factor == 1.0
 
-    def test_sanitized_name_generation(self):
-        """Test that register names are properly sanitized"""
-        test_cases = [
+    @pytest.mark.parametrize(
+        "original,expected",
+        [
             ("Test Register", "test_register"),
             ("  Spaced  Out  ", "spaced_out"),
             ("UPPERCASE NAME", "uppercase_name"),
             ("Mixed Case_Name", "mixed_case_name"),
             ("Name-With-Dashes", "name_with_dashes"),
-        ]
-
-        for original, expected in test_cases:
-            reg_data = {
-                "name": original,
-                "sampling_period_seconds": 60,
-                "register": 0x0000,
-                "length": 1,
-                "signed": False,
-                "writable": False,
-                "scale_factor": 1.0,
-                "byte_filter": None,
-                "enum": None,
-                "ha_discovery": None,
-            }
-            reg = OptolinkVS2Register(reg_data, "home/device")
-            assert reg.sanitized_name == expected
-
-    def test_mqtt_base_topic_slash_handling(self):
+        ],
+    )
+    def test_sanitized_name_generation(self, make_reg_data, original, expected):
+        """Test that register names are properly sanitized"""
+        reg = OptolinkVS2Register(make_reg_data(name=original), "home/device")
+        assert reg.sanitized_name == expected
+
+    @pytest.mark.parametrize(
+        "original",
+        [
+            "external_temperature",
+            "Domestic Hot Water Top Temperature",
+            "Flow (°C) / Return-Temp.",
+            "Pump [HC1]; speed: {max}",
+            "Path\\To\\Register, \"quoted\" 'name'",
+            "__leading and trailing__",
+            "Multiple -- separators",
+        ],
+    )
+    def test_sanitized_name_matches_replace_chain(self, make_reg_data, original):
+        """Test that the translation table sanitizes names like the per-character replace chain"""
+        expected = original.lower()
+        for c in " -/\\.,;:":
+            expected = expected.replace(c, "_")
+        for c in "()[]{}\"'":
+            expected = expected.replace(c, "")
+        expected = expected.replace("__", "_").strip("_")
+        expected = expected.encode("ascii", errors="ignore").decode("ascii")
+
+        reg = OptolinkVS2Register(make_reg_data(name=original), "home/device")
+        assert reg.sanitized_name == expected
+
+    def test_mqtt_base_topic_slash_handling(self, make_reg_data):
         """Test that trailing slashes are removed from MQTT base topic"""
-        reg_data = {
-            "name": "Test",
-            "sampling_period_seconds": 60,
-            "register": 0x0000,
-            "length": 1,
-            "signed": False,
-            "writable": False,
-            "scale_factor": 1.0,
-            "byte_filter": None,
-            "enum": None,
-            "ha_discovery": None,
-        }
+        reg_data = make_reg_data()
 
         # Test with trailing slash
         reg1 = OptolinkVS2Register(reg_data, "home/device/")
@@ -98,22 +99,21 @@ class TestOptolinkVS2RegisterInit:
         reg2 = OptolinkVS2Register(reg_data, "home/device")
         assert reg2.mqtt_base_topic == "home/device"
 
-    def test_type_conversions(self):
+    def test_type_conversions(self, make_reg_data):
         """Test that register attributes are properly type-converted"""
-        reg_data = {
-            "name": "Typed Register",
-            "sampling_period_seconds": 30,
-            "register": 0x5678,  # int
-            "length": "4",  # string instead of int
-            "signed": 1,  # truthy value
-            "writable": 0,  # falsy value
-            "scale_factor": "2.5",  # string instead of float
-            "byte_filter": None,
-            "enum": None,
-            "ha_discovery": None,
-        }
+        reg_data = make_reg_data(
+            name="Typed Register",
+            sampling_period_seconds="30",  # string instead of int
+            register=0x5678,  # int
+            length="4",  # string instead of int
+            signed=1,  # truthy value
+            writable=0,  # falsy value
+            scale_factor="2.5",  # string instead of float
+        )
         reg = OptolinkVS2Register(reg_data, "home/device")
 
+        assert isinstance(reg.sampling_period_sec, int)
+        assert reg.sampling_period_sec == 30
         assert isinstance(reg.address, int)
         assert reg.address == 0x5678
         assert isinstance(reg.length, int)
@@ -125,62 +125,42 @@ class TestOptolinkVS2RegisterInit:
         assert isinstance(reg.scale_factor, float)
         assert reg.scale_factor == 2.5
 
+    def test_read_only_register_definition(self, make_reg_data):
+        """Test that registers can be built from a frozen register definition"""
+        reg_data = MappingProxyType(make_reg_data(name="Frozen", length=2))
+        reg = OptolinkVS2Register(reg_data, "home/device")
+
+        assert reg.sanitized_name == "frozen"
+        assert reg.get_value_from_rawdata(b"\x01\x00") == 1
+
+    def test_no_instance_dict(self, make_reg_data):
+        """Test that registers use __slots__ and reject unknown attributes"""
+        reg = OptolinkVS2Register(make_reg_data(), "home/device")
+
+        assert not hasattr(reg, "__dict__")
+        with pytest.raises(AttributeError):
+            reg.unknown_attribute = 1
+
 
 class TestOptolinkVS2RegisterMQTT:
     """Tests for MQTT topic generation methods"""
 
-    def test_get_mqtt_state_topic(self):
+    def test_get_mqtt_state_topic(self, heater_reg):
         """Test MQTT state topic generation"""
-        reg_data = {
-            "name": "Living Room Temperature",
-            "sampling_period_seconds": 60,
-            "register": 0x0000,
-            "length": 2,
-            "signed": False,
-            "writable": False,
-            "scale_factor": 1.0,
-            "byte_filter": None,
-            "enum": None,
-            "ha_discovery": None,
-        }
-        reg = OptolinkVS2Register(reg_data, "home/heater")
-
-        topic = reg.get_mqtt_state_topic()
+        topic = heater_reg.get_mqtt_state_topic()
         assert topic == "home/heater/living_room_temperature"
 
-    def test_get_mqtt_command_topic(self):
+    def test_get_mqtt_command_topic(self, make_reg_data):
         """Test MQTT command topic generation"""
-        reg_data = {
-            "name": "Heating Mode",
-            "sampling_period_seconds": 60,
-            "register": 0x0000,
-            "length": 1,
-            "signed": False,
-            "writable": True,
-            "scale_factor": 1.0,
-            "byte_filter": None,
-            "enum": None,
-            "ha_discovery": None,
-        }
+        reg_data = make_reg_data(name="Heating Mode", writable=True)
         reg = OptolinkVS2Register(reg_data, "home/heater")
 
         topic = reg.get_mqtt_command_topic()
         assert topic == "home/heater/heating_mode/set"
 
-    def test_mqtt_topics_with_trailing_slash(self):
+    def test_mqtt_topics_with_trailing_slash(self, make_reg_data):
         """Test MQTT topics with trailing slash in base topic"""
-        reg_data = {
-            "name": "Test Parameter",
-            "sampling_period_seconds": 60,
-            "register": 0x0000,
-            "length": 1,
-            "signed": False,
-            "writable": False,
-            "scale_factor": 1.0,
-            "byte_filter": None,
-            "enum": None,
-            "ha_discovery": None,
-        }
+        reg_data = make_reg_data(name="Test Parameter")
         reg = OptolinkVS2Register(reg_data, "home/device/")
 
         assert reg.get_mqtt_state_topic() == "home/device/test_parameter"
@@ -189,99 +169,30 @@ class TestOptolinkVS2RegisterMQTT:
 class TestOptolinkVS2RegisterEdgeCases:
     """Tests for edge cases and special scenarios"""
 
-    def test_single_byte_register(self):
-        """Test handling of single-byte register"""
-        reg_data = {
-            "name": "Byte Value",
-            "sampling_period_seconds": 60,
-            "register": 0x0000,
-            "length": 1,
-            "signed": False,
-            "writable": False,
-            "scale_factor": 1.0,
-            "byte_filter": None,
-            "enum": None,
-            "ha_discovery": None,
-        }
-        reg = OptolinkVS2Register(reg_data, "home/device")
-
-        assert reg.get_value_from_rawdata(bytearray([0xFF])) == 255
-        assert reg.get_rawdata_from_value("255") == bytearray([0xFF])
-
-    def test_multi_byte_register(self):
-        """Test handling of multi-byte register (8 bytes)"""
-        reg_data = {
-            "name": "Large Value",
-            "sampling_period_seconds": 60,
-            "register": 0x0000,
-            "length": 8,
-            "signed": False,
-            "writable": False,
-            "scale_factor": 1.0,
-            "byte_filter": None,
-            "enum": None,
-            "ha_discovery": None,
-        }
-        reg = OptolinkVS2Register(reg_data, "home/device")
+    @pytest.mark.parametrize(
+        "length,scale_factor,rawdata,expected",
+        [
+            (1, 1.0, b"\xff", 255),
+            (8, 1.0, bytes(range(1, 9)), 0x0807060504030201),
+            (2, 1.0, b"\x00\x00", 0),
+            (2, 100.0, b"\x05\x00", 500.0),  # 5 * 100.0
+        ],
+    )
+    def test_get_value(self, make_reg, length, scale_factor, rawdata, expected):
+        """Test reading single-byte, multi-byte, zero and largely scaled values"""
+        reg = make_reg(length=length, scale_factor=scale_factor)
 
-        rawdata = bytearray([0x01, 0x02, 0x03, 0x04, 0x05, 0x06, 0x07, 0x08])
-        value = reg.get_value_from_rawdata(rawdata)
-        assert value == 0x0807060504030201
-
-    def test_zero_scale_factor(self):
-        """Test handling of zero value reading"""
-        reg_data = {
-            "name": "Zero Value",
-            "sampling_period_seconds": 60,
-            "register": 0x0000,
-            "length": 2,
-            "signed": False,
-            "writable": False,
-            "scale_factor": 1.0,
-            "byte_filter": None,
-            "enum": None,
-            "ha_discovery": None,
-        }
-        reg = OptolinkVS2Register(reg_data, "home/device")
+        assert reg.get_value_from_rawdata(rawdata) == expected
 
-        assert reg.get_value_from_rawdata(bytearray([0x00, 0x00])) == 0
-
-    def test_large_scale_factor(self):
-        """Test handling of large scale factor"""
-        reg_data = {
-            "name": "Large Scale",
-            "sampling_period_seconds": 60,
-            "register": 0x0000,
-            "length": 2,
-            "signed": False,
-            "writable": False,
-            "scale_factor": 100.0,
-            "byte_filter": None,
-            "enum": None,
-            "ha_discovery": None,
-        }
-        reg = OptolinkVS2Register(reg_data, "home/device")
+    def test_single_byte_register_write(self, make_reg):
+        """Test writing a single-byte register"""
+        reg = make_reg(name="Byte Value")
 
-        # 5 * 100.0 = 500.0
-        rawdata = bytearray([0x05, 0x00])
-        value = reg.get_value_from_rawdata(rawdata)
-        assert value == 500.0
+        assert reg.get_rawdata_from_value("255") == b"\xff"
 
-    def test_special_characters_in_name(self):
+    def test_special_characters_in_name(self, make_reg):
         """Test handling of special characters in register name"""
-        reg_data = {
-            "name": "Flow (°C) / Return-Temp.",
-            "sampling_period_seconds": 60,
-            "register": 0x0000,
-            "length": 2,
-            "signed": False,
-            "writable": False,
-            "scale_factor": 1.0,
-            "byte_filter": None,
-            "enum": None,
-            "ha_discovery": None,
-        }
-        reg = OptolinkVS2Register(reg_data, "home/device")
+        reg = make_reg(name="Flow (°C) / Return-Temp.", length=2)
 
         # Special characters should be preserved or handled correctly
         assert reg.sanitized_name == "flow_c__return_temp"
@@ -21,248 +21,175 @@ from optolink2mqtt.optolinkvs2_register import OptolinkVS2Register  # noqa: E402
 class TestOptolinkVS2RegisterValueConversion:
     """Tests for value conversion methods (get_value_from_rawdata, get_rawdata_from_value)"""
 
-    def test_get_value_unsigned_no_scale(self):
-        """Test reading unsigned integer without scaling"""
-        reg_data = {
-            "name": "Counter",
-            "sampling_period_seconds": 60,
-            "register": 0x0000,
-            "length": 2,
-            "signed": False,
-            "writable": False,
-            "scale_factor": 1.0,
-            "byte_filter": None,
-            "enum": None,
-            "ha_discovery": None,
-        }
-        reg = OptolinkVS2Register(reg_data, "home/device")
-
-        # Test little-endian conversion
-        rawdata = bytearray([0x34, 0x12])  # 0x1234 in little-endian
-        value = reg.get_value_from_rawdata(rawdata)
-        assert value == 0x1234
-
-    def test_get_value_signed_no_scale(self):
-        """Test reading signed integer without scaling"""
-        reg_data = {
-            "name": "Temperature",
-            "sampling_period_seconds": 60,
-            "register": 0x0000,
-            "length": 2,
-            "signed": True,
-            "writable": False,
-            "scale_factor": 1.0,
-            "byte_filter": None,
-            "enum": None,
-            "ha_discovery": None,
-        }
-        reg = OptolinkVS2Register(reg_data, "home/device")
-
-        # Test negative value
-        rawdata = bytearray([0xFF, 0xFF])  # -1 in two's complement
-        value = reg.get_value_from_rawdata(rawdata)
-        assert value == -1
-
-    def test_get_value_with_scale_factor(self):
-        """Test reading value with scale factor"""
-        reg_data = {
-            "name": "Temperature",
-            "sampling_period_seconds": 60,
-            "register": 0x0000,
-            "length": 2,
-            "signed": False,
-            "writable": False,
-            "scale_factor": 0.1,
-            "byte_filter": None,
-            "enum": None,
-            "ha_discovery": None,
-        }
-        reg = OptolinkVS2Register(reg_data, "home/device")
-
-        # 100 * 0.1 = 10.0
-        rawdata = bytearray([0x64, 0x00])  # 100 in little-endian
-        value = reg.get_value_from_rawdata(rawdata)
-        assert value == 10.0
-
-    def test_get_value_with_byte_filter(self):
-        """Test reading value with byte filter applied"""
-        reg_data = {
-            "name": "Filtered",
-            "sampling_period_seconds": 60,
-            "register": 0x0000,
-            "length": 4,
-            "signed": False,
-            "writable": False,
-            "scale_factor": 1.0,
-            "byte_filter": "b:1:2",  # Use bytes 1-2 (inclusive)
-            "enum": None,
-            "ha_discovery": None,
-        }
-        reg = OptolinkVS2Register(reg_data, "home/device")
-
-        # Input: [0xAA, 0xBB, 0xCC, 0xDD]
-        # After filter "b:1:2": [0xBB, 0xCC]
-        # Result: 0xCCBB
-        rawdata = bytearray([0xAA, 0xBB, 0xCC, 0xDD])
-        value = reg.get_value_from_rawdata(rawdata)
-        assert value == 0xCCBB
-
-    def test_get_value_with_enum(self):
+    @pytest.mark.parametrize(
+        "overrides,rawdata,expected",
+        [
+            # 0x1234 in little-endian
+            pytest.param({"length": 2}, b"\x34\x12", 0x1234, id="unsigned"),
+            # -1 in two's complement
+            pytest.param({"length": 2, "signed": True}, b"\xff\xff", -1, id="signed"),
+            # 100 * 0.1 = 10.0
+            pytest.param(
+                {"length": 2, "scale_factor": 0.1}, b"\x64\x00", 10.0, id="scaled"
+            ),
+            # after filter "b:1:2" (inclusive): [0xBB, 0xCC]
+            pytest.param(
+                {"length": 4, "byte_filter": "b:1:2"},
+                b"\xaa\xbb\xcc\xdd",
+                0xCCBB,
+                id="byte_filter",
+            ),
+            # after filter "b:0:1": [0x9C, 0xFF] = -100, then scaled
+            pytest.param(
+                {
+                    "length": 3,
+                    "signed": True,
+                    "scale_factor": 0.1,
+                    "byte_filter": "b:0:1",
+                },
+                b"\x9c\xff\x07",
+                -10.0,
+                id="byte_filter_signed_scaled",
+            ),
+        ],
+    )
+    def test_get_value(self, make_reg, overrides, rawdata, expected):
+        """Test reading numeric values with signedness, scale factor and byte filter"""
+        reg = make_reg(**overrides)
+        assert reg.get_value_from_rawdata(rawdata) == expected
+
+    def test_get_value_with_enum(self, make_reg):
         """Test reading enumerated value"""
         enum_dict = {0: "OFF", 1: "ON", 2: "STANDBY"}
-        reg_data = {
-            "name": "Status",
-            "sampling_period_seconds": 60,
-            "register": 0x0000,
-            "length": 1,
-            "signed": False,
-            "writable": False,
-            "scale_factor": 1.0,
-            "byte_filter": None,
-            "enum": enum_dict,
-            "ha_discovery": None,
-        }
-        reg = OptolinkVS2Register(reg_data, "home/device")
-
-        assert reg.get_value_from_rawdata(bytearray([0x00])) == "OFF"
-        assert reg.get_value_from_rawdata(bytearray([0x01])) == "ON"
-        assert reg.get_value_from_rawdata(bytearray([0x02])) == "STANDBY"
-
-    def test_get_value_with_enum_unknown_value(self):
+        reg = make_reg(name="Status", enum=enum_dict)
+
+        assert reg.get_value_from_rawdata(b"\x00") == "OFF"
+        assert reg.get_value_from_rawdata(b"\x01") == "ON"
+        assert reg.get_value_from_rawdata(b"\x02") == "STANDBY"
+
+    def test_get_value_with_enum_unknown_value(self, make_reg):
         """Test reading unknown enumerated value"""
         enum_dict = {0: "OFF", 1: "ON"}
-        reg_data = {
-            "name": "Status",
-            "sampling_period_seconds": 60,
-            "register": 0x0000,
-            "length": 1,
-            "signed": False,
-            "writable": False,
-            "scale_factor": 1.0,
-            "byte_filter": None,
-            "enum": enum_dict,
-            "ha_discovery": None,
-        }
-        reg = OptolinkVS2Register(reg_data, "home/device")
-
-        value = reg.get_value_from_rawdata(bytearray([0xFF]))
+        reg = make_reg(name="Status", enum=enum_dict)
+
+        value = reg.get_value_from_rawdata(b"\xff")
         assert value == "Unknown (255)"
 
-    def test_get_rawdata_from_value_unsigned(self):
+    def test_get_value_with_enum_multi_byte(self, make_reg):
+        """Test reading enumerated value from a 2-byte register"""
+        enum_dict = {0: "OFF", 0x0102: "AUTO"}
+        reg = make_reg(name="Mode", length=2, enum=enum_dict)
+
+        assert reg.get_value_from_rawdata(b"\x00\x00") == "OFF"
+        assert reg.get_value_from_rawdata(b"\x02\x01") == "AUTO"
+        assert reg.get_value_from_rawdata(b"\x01\x02") == "Unknown (513)"
+
+    def test_get_rawdata_from_value_unsigned(self, make_reg):
         """Test converting unsigned value to raw data"""
-        reg_data = {
-            "name": "Counter",
-            "sampling_period_seconds": 60,
-            "register": 0x0000,
-            "length": 2,
-            "signed": False,
-            "writable": True,
-            "scale_factor": 1.0,
-            "byte_filter": None,
-            "enum": None,
-            "ha_discovery": None,
-        }
-        reg = OptolinkVS2Register(reg_data, "home/device")
+        reg = make_reg(name="Counter", length=2, writable=True)
 
         rawdata = reg.get_rawdata_from_value("4660")  # 0x1234
-        assert rawdata == bytearray([0x34, 0x12])
+        assert rawdata == b"\x34\x12"
 
-    def test_get_rawdata_from_value_signed(self):
+    def test_get_rawdata_from_value_signed(self, make_reg):
         """Test converting signed value to raw data"""
-        reg_data = {
-            "name": "Temperature",
-            "sampling_period_seconds": 60,
-            "register": 0x0000,
-            "length": 2,
-            "signed": True,
-            "writable": True,
-            "scale_factor": 1.0,
-            "byte_filter": None,
-            "enum": None,
-            "ha_discovery": None,
-        }
-        reg = OptolinkVS2Register(reg_data, "home/device")
+        reg = make_reg(name="Temperature", length=2, signed=True, writable=True)
 
         rawdata = reg.get_rawdata_from_value("-1")
-        assert rawdata == bytearray([0xFF, 0xFF])
+        assert rawdata == b"\xff\xff"
 
-    def test_get_rawdata_from_value_with_scale_factor(self):
+    def test_get_rawdata_from_value_with_scale_factor(self, make_reg):
         """Test converting value with scale factor to raw data"""
-        reg_data = {
-            "name": "Temperature",
-            "sampling_period_seconds": 60,
-            "register": 0x0000,
-            "length": 2,
-            "signed": False,
-            "writable": True,
-            "scale_factor": 0.1,
-            "byte_filter": None,
-            "enum": None,
-            "ha_discovery": None,
-        }
-        reg = OptolinkVS2Register(reg_data, "home/device")
+        reg = make_reg(name="Temperature", length=2, writable=True, scale_factor=0.1)
 
         # Input 10.0 / 0.1 = 100
         rawdata = reg.get_rawdata_from_value("10.0")
-        assert rawdata == bytearray([0x64, 0x00])
+        assert rawdata == b"\x64\x00"
 
-    def test_get_rawdata_from_value_with_enum(self):
+    def test_get_rawdata_from_value_with_enum(self, make_reg):
         """Test converting enum value to raw data"""
         enum_dict = {0: "OFF", 1: "ON", 2: "STANDBY"}
-        reg_data = {
-            "name": "Status",
-            "sampling_period_seconds": 60,
-            "register": 0x0000,
-            "length": 1,
-            "signed": False,
-            "writable": True,
-            "scale_factor": 1.0,
-            "byte_filter": None,
-            "enum": enum_dict,
-            "ha_discovery": None,
-        }
-        reg = OptolinkVS2Register(reg_data, "home/device")
-
-        assert reg.get_rawdata_from_value("OFF") == bytearray([0x00])
-        assert reg.get_rawdata_from_value("ON") == bytearray([0x01])
-        assert reg.get_rawdata_from_value("STANDBY") == bytearray([0x02])
-
-    def test_get_rawdata_from_value_invalid_enum(self):
+        reg = make_reg(name="Status", writable=True, enum=enum_dict)
+
+        assert reg.get_rawdata_from_value("OFF") == b"\x00"
+        assert reg.get_rawdata_from_value("ON") == b"\x01"
+        assert reg.get_rawdata_from_value("STANDBY") == b"\x02"
+
+    @pytest.mark.parametrize("value", [0, 1, 42, 98, 99])
+    def test_enum_with_many_entries(self, make_reg, value):
+        """Test enum lookups in both directions with a 100-entry enum"""
+        enum_dict = {i: f"MODE_{i}" for i in range(100)}
+        reg = make_reg(name="Mode", writable=True, enum=enum_dict)
+
+        rawdata = reg.get_rawdata_from_value(f"MODE_{value}")
+        assert rawdata == bytes([value])
+        assert reg.get_value_from_rawdata(rawdata) == f"MODE_{value}"
+
+    def test_get_rawdata_from_value_invalid_enum(self, make_reg):
         """Test error handling for invalid enum value"""
         enum_dict = {0: "OFF", 1: "ON"}
-        reg_data = {
-            "name": "Status",
-            "sampling_period_seconds": 60,
-            "register": 0x0000,
-            "length": 1,
-            "signed": False,
-            "writable": True,
-            "scale_factor": 1.0,
-            "byte_filter": None,
-            "enum": enum_dict,
-            "ha_discovery": None,
-        }
-        reg = OptolinkVS2Register(reg_data, "home/device")
+        reg = make_reg(name="Status", writable=True, enum=enum_dict)
 
         result = reg.get_rawdata_from_value("INVALID")
         assert result is None
 
-    def test_get_rawdata_overflow_error(self):
+    def test_get_rawdata_overflow_error(self, make_reg):
         """Test error handling when value overflows the register length"""
-        reg_data = {
-            "name": "Byte",
-            "sampling_period_seconds": 60,
-            "register": 0x0000,
-            "length": 1,
-            "signed": False,
-            "writable": True,
-            "scale_factor": 1.0,
-            "byte_filter": None,
-            "enum": None,
-            "ha_discovery": None,
-        }
-        reg = OptolinkVS2Register(reg_data, "home/device")
+        reg = make_reg(name="Byte", writable=True)
 
         # 256 cannot fit in 1 byte - will raise OverflowError from int.to_bytes()
         with pytest.raises((ValueError, OverflowError)):
             reg.get_rawdata_from_value("256")
+
+    def test_get_value_signed_8_bytes(self, make_reg):
+        """Test reading and writing a signed 8-byte register"""
+        reg = make_reg(name="Counter", length=8, signed=True, writable=True)
+
+        assert reg.get_value_from_rawdata(b"\xfe\xff\xff\xff\xff\xff\xff\xff") == -2
+        assert reg.get_rawdata_from_value("-2") == b"\xfe\xff\xff\xff\xff\xff\xff\xff"
+        with pytest.raises(OverflowError):
+            reg.get_rawdata_from_value(str(1 << 63))
+
+    def test_get_rawdata_overflow_error_signed(self, make_reg):
+        """Test error handling when value overflows a signed register"""
+        reg = make_reg(name="Word", length=2, signed=True, writable=True)
+
+        assert reg.get_rawdata_from_value("32767") == b"\xff\x7f"
+        assert reg.get_rawdata_from_value("-32768") == b"\x00\x80"
+        with pytest.raises(OverflowError):
+            reg.get_rawdata_from_value("32768")
+        with pytest.raises(OverflowError):
+            reg.get_rawdata_from_value("-32769")
+
+
+# register shapes covering both the batched struct decoding and the fallback paths
+DECODE_BATCH_CASES = [
+    ({"length": 1}, b"\xff"),
+    ({"length": 2, "signed": True}, b"\xff\xff"),
+    ({"length": 2, "scale_factor": 0.1}, b"\x64\x00"),
+    ({"length": 4, "signed": True, "scale_factor": 0.5}, b"\x9c\xff\xff\xff"),
+    ({"length": 8}, bytes(range(1, 9))),
+    ({"length": 3}, b"\x01\x02\x03"),
+    ({"length": 4, "byte_filter": "b:1:2"}, b"\xaa\xbb\xcc\xdd"),
+    ({"length": 1, "enum": {0: "OFF", 1: "ON"}}, b"\x01"),
+    ({"length": 1, "enum": {0: "OFF", 1: "ON"}}, b"\x07"),
+    ({"length": 2}, b"\x01"),  # shorter than the register length
+]
+
+
+class TestOptolinkVS2RegisterDecodeBatch:
+    """Tests for the batch decoding of many registers at once"""
+
+    def test_decode_batch_matches_scalar_path(self, make_reg):
+        """Test decode_batch() returns the same values of get_value_from_rawdata()"""
+        regs = [make_reg(**overrides) for overrides, _ in DECODE_BATCH_CASES]
+        rawdatas = [rawdata for _, rawdata in DECODE_BATCH_CASES]
+
+        expected = [
+            reg.get_value_from_rawdata(rawdata) for reg, rawdata in zip(regs, rawdatas)
+        ]
+        assert OptolinkVS2Register.decode_batch(regs, rawdatas) == expected
+
+    def test_decode_batch_empty(self):
+        """Test decode_batch() with no registers"""
+        assert OptolinkVS2Register.decode_batch([], []) == []